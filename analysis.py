@@ -7,13 +7,41 @@ Generates charts, graphs, and detailed Excel reports from evaluation results
 import json
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 from pathlib import Path
 import numpy as np
 from datetime import datetime
 import os
 import sys
-import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional streaming JSON parser
+    ijson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # Optional faster Excel writer
+    xlsxwriter = None
+
+try:
+    import pyarrow
+except ImportError:  # Optional, needed only for output_format='parquet'
+    pyarrow = None
+
+# Legacy MetricData(...) tokenizer and field access, shared with create_clean_output.py
+from metric_parsing import get_field, metric_sections
+
+# Excel-safe column names: square brackets become parentheses in one pass
+_EXCEL_COLUMN_TABLE = str.maketrans('[]', '()')
+
 
 # Set style for professional charts
 sns.set_style("whitegrid")
@@ -24,14 +52,23 @@ plt.rcParams['font.size'] = 10
 class DeepEvalAnalyzer:
     """Analyze DeepEval results and create CXO-ready visualizations"""
     
-    def __init__(self, results_json_path: str, output_dir: str = "analysis_output"):
+    def __init__(self, results_json_path: str, output_dir: str = "analysis_output", high_dpi: bool = False,
+                 output_format: str = "xlsx"):
         """
         Initialize analyzer
         
         Args:
             results_json_path: Path to the *_results.json file
             output_dir: Directory for analysis outputs
+            high_dpi: Save charts at 300 dpi (print quality) instead of 150 dpi
+            output_format: Format of the detailed analysis - 'xlsx' or 'parquet'
+                           (much faster to write and re-load from Python tools)
         """
+        if output_format not in ('xlsx', 'parquet'):
+            raise ValueError(f"Unsupported output_format: {output_format} (use 'xlsx' or 'parquet')")
+        if output_format == 'parquet' and pyarrow is None:
+            raise ImportError("output_format='parquet' requires pyarrow (pip install pyarrow)")
+        
         self.results_path = results_json_path
         self.output_dir = output_dir
         self.charts_dir = os.path.join(output_dir, "charts")
@@ -40,23 +77,61 @@ class DeepEvalAnalyzer:
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.charts_dir, exist_ok=True)
         
-        # Load results
-        with open(results_json_path, 'r') as f:
-            self.data = json.load(f)
+        # Results are loaded lazily - see the data property and _iter_conversations
+        self._data = None
+        self._metrics_df = None
+        self._summary_df = None
+        
+        self.dpi = 300 if high_dpi else 150
+        self.output_format = output_format
         
         self.filename = Path(results_json_path).stem
         print(f"📊 Analyzing: {self.filename}")
         print(f"📁 Output directory: {self.output_dir}")
     
+    @property
+    def data(self) -> dict:
+        """Full results JSON, parsed on first access"""
+        if self._data is None:
+            # orjson is much faster on large, number-heavy result files
+            if orjson is not None:
+                self._data = orjson.loads(Path(self.results_path).read_bytes())
+            else:
+                with open(self.results_path, 'r') as f:
+                    self._data = json.load(f)
+        return self._data
+    
+    def _iter_conversations(self):
+        """
+        Yield conversations one at a time
+        
+        Streams them from disk with ijson when available, so large result files
+        are never held in memory all at once
+        """
+        if ijson is None or self._data is not None:
+            yield from self.data.get('conversations', [])
+            return
+        
+        with open(self.results_path, 'rb') as f:
+            yield from ijson.items(f, 'conversations.item', use_float=True)
+    
     def truncate_text(self, text: str, max_words: int = 100) -> str:
         """Truncate text to max_words"""
         if not text:
             return ""
-        words = str(text).split()
+        # Split at most max_words times - the remainder of a long text stays one piece
+        words = str(text).split(maxsplit=max_words)
         if len(words) <= max_words:
             return text
         return ' '.join(words[:max_words]) + "..."
     
+    def truncate_series(self, series: pd.Series, max_words: int = 100) -> pd.Series:
+        """Vectorized truncate_text: truncate every value in a Series to max_words"""
+        text = series.fillna('').astype(str)
+        words = text.str.split(n=max_words)
+        truncated = words.str[:max_words].str.join(' ') + "..."
+        return text.where(words.str.len() <= max_words, truncated)
+    
     def get_excel_column_letter(self, idx: int) -> str:
         """Convert column index (0-based) to Excel column letter (A, B, ..., Z, AA, AB, ...)"""
         letter = ''
@@ -94,32 +169,17 @@ class DeepEvalAnalyzer:
         """Extract metrics from string representation (old format)"""
         metrics = {}
         
-        # Split by MetricData to find all metrics
-        metric_sections = str(metrics_str).split("MetricData(")
-        
-        for section in metric_sections[1:]:  # Skip first empty part
+        if not isinstance(metrics_str, str):
+            metrics_str = repr(metrics_str)
+        for fields in metric_sections(metrics_str):
             try:
-                # Extract name
-                name_match = re.search(r"name='([^']+)'", section)
-                if not name_match:
+                # Name, score and success are required
+                name = fields.get("name")
+                if name is None or "score" not in fields or "success" not in fields:
                     continue
-                name = name_match.group(1)
-                
-                # Extract score
-                score_match = re.search(r"score=([0-9.]+)", section)
-                if not score_match:
-                    continue
-                score = float(score_match.group(1))
-                
-                # Extract success/pass
-                success_match = re.search(r"success=(\w+)", section)
-                if not success_match:
-                    continue
-                success = success_match.group(1) == 'True'
-                
-                # Extract reason (full text)
-                reason_match = re.search(r"reason='([^']*(?:''[^']*)*?)'", section, re.DOTALL)
-                reason = reason_match.group(1).replace("''", "'") if reason_match else ""
+                score = float(fields["score"])
+                success = fields["success"] == 'True'
+                reason = fields.get("reason", "").replace("''", "'")
                 
                 metrics[name] = {
                     "score": score,
@@ -131,19 +191,67 @@ class DeepEvalAnalyzer:
         
         return metrics
     
+    def extract_metrics_from_objects(self, metrics_data):
+        """
+        Extract metrics by reading MetricData fields directly (DeepEval objects)
+        
+        Accepts an EvaluationResult-like object with test_results, or a list of
+        MetricData objects/dicts. Returns None if the input has neither shape.
+        """
+        if not isinstance(metrics_data, list):
+            test_results = getattr(metrics_data, 'test_results', None)
+            if test_results is None:
+                return None
+            metrics_data = [metric for test_result in test_results
+                            for metric in (getattr(test_result, 'metrics_data', None) or [])]
+        
+        metrics = {}
+        for metric in metrics_data:
+            name = get_field(metric, 'name')
+            if name is None:
+                return None
+            metrics[name] = {
+                "score": get_field(metric, 'score') or 0.0,
+                "pass": get_field(metric, 'success') or False,
+                "reason": get_field(metric, 'reason') or ''
+            }
+        return metrics
+    
     def extract_metrics(self, metrics_data) -> dict:
-        """Extract metrics from either dict or string format"""
+        """Extract metrics from dict, DeepEval object or string format"""
+        if not metrics_data:
+            return {}
         if isinstance(metrics_data, dict):
             return self.extract_metrics_from_dict(metrics_data)
-        else:
-            return self.extract_metrics_from_string(str(metrics_data))
+        if not isinstance(metrics_data, str):
+            # Read structured fields directly rather than via str() and regex
+            metrics = self.extract_metrics_from_objects(metrics_data)
+            if metrics is not None:
+                return metrics
+        return self.extract_metrics_from_string(metrics_data)
     
     def extract_metrics_data(self):
-        """Extract all metrics data into structured format"""
-        conversations = self.data.get('conversations', [])
+        """Extract all metrics data into structured format (computed once, then cached)"""
+        return self._build_frames()[0]
+    
+    def _build_frames(self) -> tuple:
+        """
+        Walk the conversations once, building both the detailed metrics frame
+        and the per-test-case score frame used by the executive summary
         
-        all_data = []
-        for conv in conversations:
+        Returns:
+            Tuple of (detailed_df, summary_df), cached after the first call
+        """
+        if self._metrics_df is None:
+            self._metrics_df, self._summary_df = self._compute_frames()
+        return self._metrics_df, self._summary_df
+    
+    def _compute_frames(self) -> tuple:
+        """Parse the conversations into (detailed_df, summary_df) - see _build_frames"""
+        columns = {}
+        summary_columns = {}
+        row_count = 0
+        for conv in self._iter_conversations():
             # Get test case data
             model_a = conv.get('model_a_evaluation', {})
             model_b = conv.get('model_b_evaluation', {})
@@ -208,32 +316,75 @@ class DeepEvalAnalyzer:
             metrics_b = model_b.get('metrics', {})
             
             # Extract metric scores and reasons
+            test_case_name = conv.get('test_case_name', '')
             row = {
-                'Test Case': conv.get('test_case_name', ''),
+                'Test Case': test_case_name,
                 'Initial Conversation': '\n'.join(initial_conversation),
                 'User Query': user_query,
                 'Model A Response': model_a_response,
                 'Model B Response': model_b_response,
-                'Chatbot Role (100 words)': self.truncate_text(chatbot_role, 100),
+                'Chatbot Role (100 words)': chatbot_role,
+            }
+            
+            summary_row = {
+                'Test Case': test_case_name,
             }
             
             # Add Model A metrics - handle both dict and string formats
             parsed_metrics_a = self.extract_metrics(metrics_a)
             for metric_name, metric_data in parsed_metrics_a.items():
-                row[f'Model A - {metric_name} Score'] = round(metric_data['score'], 3)
+                score = round(metric_data['score'], 3)
+                row[f'Model A - {metric_name} Score'] = score
                 row[f'Model A - {metric_name} Pass'] = metric_data['pass']
                 row[f'Model A - {metric_name} Reason'] = metric_data['reason'] or 'N/A'
+                summary_row[f'{metric_name} - Model A'] = score
             
             # Add Model B metrics - handle both dict and string formats
             parsed_metrics_b = self.extract_metrics(metrics_b)
             for metric_name, metric_data in parsed_metrics_b.items():
-                row[f'Model B - {metric_name} Score'] = round(metric_data['score'], 3)
+                score = round(metric_data['score'], 3)
+                row[f'Model B - {metric_name} Score'] = score
                 row[f'Model B - {metric_name} Pass'] = metric_data['pass']
                 row[f'Model B - {metric_name} Reason'] = metric_data['reason'] or 'N/A'
+                summary_row[f'{metric_name} - Model B'] = score
             
-            all_data.append(row)
+            self._append_row(columns, row, row_count)
+            self._append_row(summary_columns, summary_row, row_count)
+            row_count += 1
+        
+        df = pd.DataFrame(columns)
+        if not df.empty:
+            df['Chatbot Role (100 words)'] = self.truncate_series(df['Chatbot Role (100 words)'], 100)
         
-        return pd.DataFrame(all_data)
+        return self.optimize_dtypes(df), pd.DataFrame(summary_columns)
+    
+    def optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Shrink metric columns: pass flags to nullable boolean and the
+        often-repeated reasons to category (scores stay float64)
+        """
+        for col in df.columns:
+            if col.endswith(' Pass'):
+                df[col] = df[col].astype('boolean')
+            elif col.endswith(' Reason'):
+                df[col] = df[col].astype('category')
+        return df
+    
+    def _append_row(self, columns: dict, row: dict, row_count: int):
+        """
+        Append a row to column lists, padding with None so every column stays row_count + 1 long
+        
+        Metric names vary per conversation, so building columns directly avoids
+        pandas aligning a list of ragged row dicts
+        """
+        for key, value in row.items():
+            if key not in columns:
+                columns[key] = [None] * row_count
+            columns[key].append(value)
+        
+        for values in columns.values():
+            if len(values) == row_count:
+                values.append(None)
     
     def create_detailed_excel(self):
         """Create comprehensive Excel with all data and metrics"""
@@ -241,25 +392,41 @@ class DeepEvalAnalyzer:
         
         df = self.extract_metrics_data()
         
-        # Sanitize column names for Excel compatibility
-        df.columns = [col.replace('[', '(').replace(']', ')') for col in df.columns]
+        # Sanitize column names for Excel compatibility (rename returns a new frame,
+        # leaving the cached metrics data untouched for the heatmap)
+        df = df.rename(columns=lambda col: col.translate(_EXCEL_COLUMN_TABLE))
+        
+        if self.output_format == 'parquet':
+            parquet_path = os.path.join(self.output_dir, f"{self.filename}_detailed_analysis.parquet")
+            df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+            print(f"✅ Detailed Parquet saved: {parquet_path}")
+            return parquet_path
         
         # Create Excel with formatting
         excel_path = os.path.join(self.output_dir, f"{self.filename}_detailed_analysis.xlsx")
         
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+        # Column widths: longest value or header + 2, capped at 100 characters for readability.
+        # Only text columns are measured; scores and pass flags fit in 8 characters
+        text_cols = df.select_dtypes(include=['object', 'category']).columns
+        value_lengths = pd.Series(8.0, index=df.columns)
+        if len(text_cols):
+            value_lengths[text_cols] = df[text_cols].astype(str).apply(lambda s: s.str.len().max())
+        value_lengths = value_lengths.fillna(0).to_numpy()
+        header_lengths = np.array([len(col) for col in df.columns])
+        widths = np.minimum(np.maximum(value_lengths, header_lengths) + 2, 100)
+        
+        # xlsxwriter writes faster and with less memory than openpyxl's in-memory workbook
+        engine = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+        with pd.ExcelWriter(excel_path, engine=engine) as writer:
             df.to_excel(writer, sheet_name='Full Analysis', index=False)
             
-            # Auto-adjust column widths
             worksheet = writer.sheets['Full Analysis']
-            for idx, col in enumerate(df.columns):
-                max_length = max(
-                    df[col].astype(str).map(len).max(),
-                    len(col)
-                ) + 2
-                # Cap at 100 characters for readability
-                col_letter = self.get_excel_column_letter(idx)
-                worksheet.column_dimensions[col_letter].width = min(max_length, 100)
+            for idx, width in enumerate(widths):
+                if engine == 'xlsxwriter':
+                    worksheet.set_column(idx, idx, width)
+                else:
+                    col_letter = self.get_excel_column_letter(idx)
+                    worksheet.column_dimensions[col_letter].width = width
         
         print(f"✅ Detailed Excel saved: {excel_path}")
         return excel_path
@@ -268,38 +435,10 @@ class DeepEvalAnalyzer:
         """Create executive summary Excel with key metrics"""
         print("\n📊 Creating executive summary Excel...")
         
-        conversations = self.data.get('conversations', [])
-        
-        summary_data = []
-        metric_scores_a = []
-        metric_scores_b = []
-        metric_names = []
-        
-        for conv in conversations:
-            model_a = conv.get('model_a_evaluation', {})
-            model_b = conv.get('model_b_evaluation', {})
-            
-            metrics_a = model_a.get('metrics', {})
-            metrics_b = model_b.get('metrics', {})
-            
-            row = {
-                'Test Case': conv.get('test_case_name', ''),
-            }
-            
-            # Extract scores - handle both dict and string formats
-            parsed_metrics_a = self.extract_metrics(metrics_a)
-            for metric_name, metric_data in parsed_metrics_a.items():
-                if metric_name not in metric_names:
-                    metric_names.append(metric_name)
-                row[f'{metric_name} - Model A'] = round(metric_data['score'], 3)
-            
-            parsed_metrics_b = self.extract_metrics(metrics_b)
-            for metric_name, metric_data in parsed_metrics_b.items():
-                row[f'{metric_name} - Model B'] = round(metric_data['score'], 3)
-            
-            summary_data.append(row)
+        df_summary = self._build_frames()[1]
         
-        df_summary = pd.DataFrame(summary_data)
+        # Model A metric names, in order of first appearance
+        metric_names = [col[:-len(' - Model A')] for col in df_summary.columns if col.endswith(' - Model A')]
         
         # Calculate averages
         avg_data = {'Metric': [], 'Model A Avg': [], 'Model B Avg': [], 'Difference (B-A)': [], 'Better Performer': []}
@@ -325,18 +464,28 @@ class DeepEvalAnalyzer:
         # Save to Excel
         excel_path = os.path.join(self.output_dir, f"{self.filename}_executive_summary.xlsx")
         
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+        with pd.ExcelWriter(excel_path, engine='xlsxwriter' if xlsxwriter is not None else 'openpyxl') as writer:
             df_avg.to_excel(writer, sheet_name='Metric Averages', index=False)
             df_summary.to_excel(writer, sheet_name='All Test Cases', index=False)
         
         print(f"✅ Executive summary saved: {excel_path}")
         return excel_path, df_avg
     
+    def _new_figure(self, figsize: tuple) -> Figure:
+        """
+        Create a standalone figure for one chart
+        
+        Figures are created outside pyplot's global state so charts can be
+        rendered from worker threads
+        """
+        return Figure(figsize=figsize)
+    
     def create_metric_comparison_chart(self, df_avg):
         """Create bar chart comparing Model A vs Model B across all metrics"""
         print("\n📈 Creating metric comparison chart...")
         
-        fig, ax = plt.subplots(figsize=(14, 8))
+        fig = self._new_figure((14, 8))
+        ax = fig.subplots()
         
         x = np.arange(len(df_avg['Metric']))
         width = 0.35
@@ -355,17 +504,12 @@ class DeepEvalAnalyzer:
         ax.grid(axis='y', alpha=0.3)
         
         # Add value labels on bars
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:.2f}',
-                       ha='center', va='bottom', fontsize=9)
-        
-        plt.tight_layout()
+        ax.bar_label(bars1, fmt='%.2f', fontsize=9)
+        ax.bar_label(bars2, fmt='%.2f', fontsize=9)
+        
+        fig.tight_layout()
         chart_path = os.path.join(self.charts_dir, 'metric_comparison.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(chart_path, dpi=self.dpi, bbox_inches='tight')
         
         print(f"✅ Chart saved: {chart_path}")
         return chart_path
@@ -376,7 +520,8 @@ class DeepEvalAnalyzer:
         
         performance_counts = df_avg['Better Performer'].value_counts()
         
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig = self._new_figure((10, 8))
+        ax = fig.subplots()
         
         colors = ['#2ecc71', '#3498db', '#95a5a6']
         explode = [0.05 if w == 'Model B' else 0 for w in performance_counts.index]
@@ -393,10 +538,9 @@ class DeepEvalAnalyzer:
         
         ax.set_title('Performance Distribution Across Metrics', fontsize=14, fontweight='bold')
         
-        plt.tight_layout()
+        fig.tight_layout()
         chart_path = os.path.join(self.charts_dir, 'performance_distribution.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(chart_path, dpi=self.dpi, bbox_inches='tight')
         
         print(f"✅ Chart saved: {chart_path}")
         return chart_path
@@ -416,7 +560,8 @@ class DeepEvalAnalyzer:
             return None
         
         # Create separate heatmaps
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+        fig = self._new_figure((18, 8))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Model A heatmap
         data_a = df[score_cols_a].T
@@ -440,10 +585,9 @@ class DeepEvalAnalyzer:
         ax2.set_xlabel('Test Cases', fontweight='bold')
         ax2.set_ylabel('Metrics', fontweight='bold')
         
-        plt.tight_layout()
+        fig.tight_layout()
         chart_path = os.path.join(self.charts_dir, 'metrics_heatmap.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(chart_path, dpi=self.dpi, bbox_inches='tight')
         
         print(f"✅ Chart saved: {chart_path}")
         return chart_path
@@ -452,7 +596,8 @@ class DeepEvalAnalyzer:
         """Create chart showing improvement of Model B over Model A"""
         print("\n📈 Creating improvement analysis chart...")
         
-        fig, ax = plt.subplots(figsize=(14, 8))
+        fig = self._new_figure((14, 8))
+        ax = fig.subplots()
         
         # Sort by difference
         df_sorted = df_avg.sort_values('Difference (B-A)')
@@ -467,17 +612,13 @@ class DeepEvalAnalyzer:
         ax.axvline(x=0, color='black', linestyle='-', linewidth=0.8)
         ax.grid(axis='x', alpha=0.3)
         
-        # Add value labels
-        for i, (bar, val) in enumerate(zip(bars, df_sorted['Difference (B-A)'])):
-            ax.text(val, bar.get_y() + bar.get_height()/2, 
-                   f'{val:+.3f}',
-                   ha='left' if val > 0 else 'right', 
-                   va='center', fontsize=9, fontweight='bold')
+        # Add value labels (bar_label places them past each bar's end, on either side of 0)
+        ax.bar_label(bars, labels=[f'{val:+.3f}' for val in df_sorted['Difference (B-A)']],
+                     fontsize=9, fontweight='bold')
         
-        plt.tight_layout()
+        fig.tight_layout()
         chart_path = os.path.join(self.charts_dir, 'improvement_analysis.png')
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(chart_path, dpi=self.dpi, bbox_inches='tight')
         
         print(f"✅ Chart saved: {chart_path}")
         return chart_path
@@ -525,18 +666,22 @@ class DeepEvalAnalyzer:
         report.append("-"*80)
         
         top_improvements = df_avg.nlargest(3, 'Difference (B-A)')
-        for i, row in enumerate(top_improvements.itertuples(), 1):
-            report.append(f"{i}. {row.Metric}")
-            report.append(f"   Model A: {row._2:.3f} | Model B: {row._3:.3f} | Improvement: +{row._4:.3f}")
+        for i, (metric, avg_a, avg_b, diff) in enumerate(zip(
+                top_improvements['Metric'], top_improvements['Model A Avg'],
+                top_improvements['Model B Avg'], top_improvements['Difference (B-A)']), 1):
+            report.append(f"{i}. {metric}")
+            report.append(f"   Model A: {avg_a:.3f} | Model B: {avg_b:.3f} | Improvement: +{diff:.3f}")
         
         # Areas needing attention
         report.append("\n⚠️  AREAS NEEDING ATTENTION")
         report.append("-"*80)
         
         bottom_improvements = df_avg.nsmallest(3, 'Difference (B-A)')
-        for i, row in enumerate(bottom_improvements.itertuples(), 1):
-            report.append(f"{i}. {row.Metric}")
-            report.append(f"   Model A: {row._2:.3f} | Model B: {row._3:.3f} | Difference: {row._4:+.3f}")
+        for i, (metric, avg_a, avg_b, diff) in enumerate(zip(
+                bottom_improvements['Metric'], bottom_improvements['Model A Avg'],
+                bottom_improvements['Model B Avg'], bottom_improvements['Difference (B-A)']), 1):
+            report.append(f"{i}. {metric}")
+            report.append(f"   Model A: {avg_a:.3f} | Model B: {avg_b:.3f} | Difference: {diff:+.3f}")
         
         # Recommendations
         report.append("\n💡 KEY RECOMMENDATIONS")
@@ -578,11 +723,17 @@ class DeepEvalAnalyzer:
         # Create executive summary
         exec_excel, df_avg = self.create_executive_summary_excel()
         
-        # Create visualizations
-        metric_chart = self.create_metric_comparison_chart(df_avg)
-        performance_chart = self.create_performance_pie_chart(df_avg)
-        heatmap_chart = self.create_heatmap()
-        improvement_chart = self.create_improvement_chart(df_avg)
+        # Create visualizations - charts are independent, so render them concurrently
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            metric_future = executor.submit(self.create_metric_comparison_chart, df_avg)
+            performance_future = executor.submit(self.create_performance_pie_chart, df_avg)
+            heatmap_future = executor.submit(self.create_heatmap)
+            improvement_future = executor.submit(self.create_improvement_chart, df_avg)
+        
+        metric_chart = metric_future.result()
+        performance_chart = performance_future.result()
+        heatmap_chart = heatmap_future.result()
+        improvement_chart = improvement_future.result()
         
         # Generate insights
         insights_report = self.generate_insights_report(df_avg)
@@ -607,21 +758,32 @@ class DeepEvalAnalyzer:
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python analysis.py <path_to_results.json> [output_directory]")
+    flags = {'--high-dpi', '--parquet'}
+    high_dpi = '--high-dpi' in sys.argv
+    output_format = 'parquet' if '--parquet' in sys.argv else 'xlsx'
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    
+    if len(args) < 1:
+        print("Usage: python analysis.py <path_to_results.json> [output_directory] [--high-dpi] [--parquet]")
         print("\nExample:")
         print("  python analysis.py evaluation_result/test_results.json")
         print("  python analysis.py evaluation_result/test_results.json custom_analysis")
+        print("  python analysis.py evaluation_result/test_results.json --high-dpi  (300 dpi charts)")
+        print("  python analysis.py evaluation_result/test_results.json --parquet   (detailed data as .parquet)")
         sys.exit(1)
     
-    results_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "analysis_output"
+    results_path = args[0]
+    output_dir = args[1] if len(args) > 1 else "analysis_output"
     
     if not os.path.exists(results_path):
         print(f"❌ Error: File not found: {results_path}")
         sys.exit(1)
     
-    analyzer = DeepEvalAnalyzer(results_path, output_dir)
+    if output_format == 'parquet' and pyarrow is None:
+        print("❌ Error: --parquet requires pyarrow (pip install pyarrow)")
+        sys.exit(1)
+    
+    analyzer = DeepEvalAnalyzer(results_path, output_dir, high_dpi=high_dpi, output_format=output_format)
     analyzer.run_full_analysis()
 
 
@@ -19,13 +19,26 @@ Output columns:
 import pandas as pd
 import json
 import re
+from functools import lru_cache
 from typing import List, Dict
 
+try:
+    import xlsxwriter
+except ImportError:  # Optional faster Excel writer
+    xlsxwriter = None
 
+# Role markers used to split "assistant: ... user: ..." text into turns
+ROLE_SPLIT = re.compile(r'(assistant|user)\s*:?\s*', re.IGNORECASE)
+TRAILING_ROLE = re.compile(r'\s*(assistant|user)\s*:?\s*$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=8192)
 def parse_conversation_history_to_json(conversation_text: str) -> str:
     """
     Convert conversation history from text format to JSON format
     
+    Results are cached, since sheets often repeat the same history across rows
+    
     Args:
         conversation_text: Text in format like "assistant: hello user: hi assistant: how are you"
         
@@ -42,8 +55,7 @@ def parse_conversation_history_to_json(conversation_text: str) -> str:
     
     # Pattern 1: "assistant: content user: content" or "assistant content user content"
     # Split by role markers
-    pattern = r'(assistant|user)\s*:?\s*'
-    parts = re.split(pattern, conversation_text, flags=re.IGNORECASE)
+    parts = ROLE_SPLIT.split(conversation_text)
     
     # Remove empty strings and process pairs
     parts = [p.strip() for p in parts if p.strip()]
@@ -54,7 +66,7 @@ def parse_conversation_history_to_json(conversation_text: str) -> str:
         if role in ['assistant', 'user']:
             content = parts[i + 1].strip()
             # Remove trailing role markers from content
-            content = re.sub(r'\s*(assistant|user)\s*:?\s*$', '', content, flags=re.IGNORECASE).strip()
+            content = TRAILING_ROLE.sub('', content).strip()
             
             if content:
                 turns.append({
@@ -68,6 +80,18 @@ def parse_conversation_history_to_json(conversation_text: str) -> str:
     return json.dumps(turns, ensure_ascii=False)
 
 
+def _text_column(df: pd.DataFrame, column: str, default: str = '') -> pd.Series:
+    """
+    Return a column as stripped strings, with missing cells (or a missing column) set to default
+    """
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    
+    values = df[column]
+    stripped = values.astype(str).str.strip()
+    return stripped.where(values.notna(), default)
+
+
 def convert_excel_format(input_path: str, output_path: str):
     """
     Convert Excel from user's format to required format
@@ -82,35 +106,19 @@ def convert_excel_format(input_path: str, output_path: str):
     print(f"Input columns: {list(df.columns)}")
     print(f"Number of rows: {len(df)}")
     
-    # Create new DataFrame with required columns
-    converted_data = []
-    
-    for idx, row in df.iterrows():
-        # Convert conversation_history to JSON format
-        conversation_json = parse_conversation_history_to_json(
-            row.get('conversation_history', '')
-        )
-        
-        converted_row = {
-            'Initial Conversation': conversation_json,
-            'User Query': str(row.get('query', '')).strip() if pd.notna(row.get('query')) else '',
-            'Model A Response': str(row.get('response_A', '')).strip() if pd.notna(row.get('response_A')) else '',
-            'Model B Response': str(row.get('response_B', '')).strip() if pd.notna(row.get('response_B')) else '',
-            'Chatbot Role': 'helpful AI assistant',  # Default role, can be customized
-        }
-        
-        # Optionally include test_id as metadata
-        if 'test_id' in row and pd.notna(row['test_id']):
-            converted_row['Test ID'] = row['test_id']
-        
-        # Check if user's input has a chatbot_role column
-        if 'chatbot_role' in row and pd.notna(row['chatbot_role']):
-            converted_row['Chatbot Role'] = str(row['chatbot_role']).strip()
-        
-        converted_data.append(converted_row)
+    # Build required columns with vectorized column operations
+    converted_df = pd.DataFrame({
+        'Initial Conversation': _text_column(df, 'conversation_history').map(parse_conversation_history_to_json),
+        'User Query': _text_column(df, 'query'),
+        'Model A Response': _text_column(df, 'response_A'),
+        'Model B Response': _text_column(df, 'response_B'),
+        # Default role, can be customized with a chatbot_role column
+        'Chatbot Role': _text_column(df, 'chatbot_role', default='helpful AI assistant'),
+    }, index=df.index)
     
-    # Create new DataFrame
-    converted_df = pd.DataFrame(converted_data)
+    # Optionally include test_id as metadata
+    if 'test_id' in df.columns and df['test_id'].notna().any():
+        converted_df['Test ID'] = df['test_id']
     
     # Reorder columns (Test ID first if it exists, then the required columns)
     column_order = []
@@ -120,8 +128,9 @@ def convert_excel_format(input_path: str, output_path: str):
     
     converted_df = converted_df[column_order]
     
-    # Save to Excel
-    converted_df.to_excel(output_path, index=False)
+    # Save to Excel (xlsxwriter streams the file out instead of building an openpyxl workbook)
+    converted_df.to_excel(output_path, index=False,
+                          engine='xlsxwriter' if xlsxwriter is not None else 'openpyxl')
     
     print(f"\n✅ Conversion complete!")
     print(f"Output saved to: {output_path}")
@@ -5,68 +5,112 @@ Handles both single and multiple conversations
 """
 
 import json
+import logging
+import mmap
 import os
-import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON parser/serializer
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # Optional streaming JSON parser
+    ijson = None
+
+from metric_parsing import get_field, metric_sections
+
+# Metrics-only JSON is written compactly for tools; set CLEAN_OUTPUT_PRETTY=1
+# to indent it for reading in an editor
+PRETTY_JSON = os.environ.get("CLEAN_OUTPUT_PRETTY", "0") == "1"
+
+logger = logging.getLogger(__name__)
+
+# Markdown status marks, indexed by a metric's pass flag
+_STATUS = ("❌", "✅")
+
+# Comparison labels, indexed by sign(Model B score - Model A score) + 1
+_COMPARISON_LABELS = ("Model A scores higher", "Equivalent performance", "Model B scores higher")
+
+# Below this size a plain read is cheaper than setting up a memory map
+_MMAP_MIN_SIZE = 256 * 1024
+
+# Top-level fields read from a results file besides its conversations
+_HEADER_FIELDS = ("file", "timestamp", "mode", "total_conversations")
+
+
+def _structured_metrics_data(result):
+    """
+    Return the MetricData entries of a structured evaluation result
+    
+    Handles dicts (as saved to JSON) and live DeepEval objects with test_results,
+    as well as a plain list of MetricData. Returns None for anything else,
+    including lists of repr strings, which are left to the string parser.
+    """
+    if isinstance(result, list):
+        if all(isinstance(metric, dict) or hasattr(metric, 'name') for metric in result):
+            return result
+        return None
+    if isinstance(result, str):
+        return None
+    
+    test_results = get_field(result, 'test_results')
+    if test_results is None:
+        return None
+    
+    metrics_data = []
+    for test_result in test_results:
+        metrics_data.extend(get_field(test_result, 'metrics_data') or [])
+    return metrics_data
 
 
 def extract_metrics(result_dict):
-    """Extract ALL metrics from evaluation results - supports both dict and string formats"""
+    """Extract ALL metrics from evaluation results - supports dict, object and string formats"""
     metrics = {}
     
-    # NEW FORMAT: Dictionary with test_results
-    if isinstance(result_dict, dict) and 'test_results' in result_dict:
+    # Nothing to parse for a model that was not evaluated (None, "", {} or [])
+    if not result_dict:
+        return metrics
+    
+    # NEW FORMAT: Structured test_results - read fields directly instead of
+    # stringifying the whole result and parsing it back with regex
+    metrics_data = _structured_metrics_data(result_dict)
+    if metrics_data is not None:
         try:
-            for test_result in result_dict['test_results']:
-                if 'metrics_data' in test_result:
-                    for metric in test_result['metrics_data']:
-                        name = metric.get('name', '')
-                        score = metric.get('score', 0.0)
-                        success = metric.get('success', False)
-                        threshold = metric.get('threshold', 0.5)
-                        reason = metric.get('reason', '') if metric.get('reason') else ''
-                        
-                        metrics[name] = {
-                            "score": round(score, 4),
-                            "pass": success,
-                            "threshold": threshold,
-                            "reason": reason
-                        }
+            for metric in metrics_data:
+                name = get_field(metric, 'name', '')
+                score = get_field(metric, 'score', 0.0)
+                success = get_field(metric, 'success', False)
+                threshold = get_field(metric, 'threshold', 0.5)
+                reason = get_field(metric, 'reason') or ''
+                
+                metrics[name] = {
+                    "score": round(score, 4),
+                    "pass": success,
+                    "threshold": threshold,
+                    "reason": reason
+                }
             return metrics
         except Exception as e:
-            # Fall through to string parsing if dict parsing fails
-            pass
-    
-    # OLD FORMAT: String parsing (backward compatibility)
-    metrics_str = str(result_dict)
-    metric_sections = metrics_str.split("MetricData(")
+            # Fall through to string parsing if structured parsing fails
+            metrics = {}
     
-    for section in metric_sections[1:]:  # Skip first empty part
+    # OLD FORMAT: String parsing (backward compatibility); only objects that
+    # are not already a string need their repr built
+    metrics_str = result_dict if isinstance(result_dict, str) else repr(result_dict)
+    for fields in metric_sections(metrics_str):
         try:
-            # Extract name
-            name_match = re.search(r"name='([^']+)'", section)
-            if not name_match:
-                continue
-            name = name_match.group(1)
-            
-            # Extract score
-            score_match = re.search(r"score=([0-9.]+)", section)
-            if not score_match:
+            # Name, score and success are required
+            name = fields.get("name")
+            if name is None or "score" not in fields or "success" not in fields:
                 continue
-            score = float(score_match.group(1))
-            
-            # Extract success/pass
-            success_match = re.search(r"success=(\w+)", section)
-            if not success_match:
-                continue
-            success = success_match.group(1) == 'True'
-            
-            # Extract threshold
-            threshold_match = re.search(r"threshold=([0-9.]+)", section)
-            threshold = float(threshold_match.group(1)) if threshold_match else 0.5
-            
-            # Extract reason (full text)
-            reason_match = re.search(r"reason='([^']*(?:''[^']*)*?)'", section, re.DOTALL)
-            reason = reason_match.group(1).replace("''", "'") if reason_match else ""
+            score = float(fields["score"])
+            success = fields["success"] == 'True'
+            threshold = float(fields["threshold"]) if "threshold" in fields else 0.5
+            reason = fields.get("reason", "").replace("''", "'")
             
             metrics[name] = {
                 "score": round(score, 4),
@@ -80,143 +124,308 @@ def extract_metrics(result_dict):
     return metrics
 
 
-def process_result_file(result_json_path):
-    """Process a single result JSON and create clean outputs"""
-    with open(result_json_path) as f:
-        data = json.load(f)
+def _metric_lines(metrics, metric_order):
+    """Render a model's metrics as markdown list items, one per line, in metric_order"""
+    lines = []
+    for metric in metric_order:
+        values = metrics.get(metric)
+        if values is not None:
+            lines.append(f"\n- {_STATUS[bool(values['pass'])]} **{metric}**: {values['score']:.4f}")
+    return "".join(lines)
+
+
+def _load_json(f):
+    """
+    Parse a whole JSON file from a binary handle
+    
+    With orjson, files of at least _MMAP_MIN_SIZE bytes are parsed straight
+    from a read-only memory map instead of being read into a bytes copy first.
+    """
+    if orjson is None:
+        return json.load(f)
+    if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+        return orjson.loads(f.read())
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+        return orjson.loads(view)
+
+
+def _write_json(path, obj):
+    """Write obj as UTF-8 JSON (compact unless PRETTY_JSON), using orjson when available"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if PRETTY_JSON else 0))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2 if PRETTY_JSON else None, ensure_ascii=False)
+
+
+def _header_value(prefix, event):
+    """True for a scalar value event of one of the top-level header fields"""
+    return prefix in _HEADER_FIELDS and event not in ("start_map", "start_array", "map_key")
+
+
+def _stream_results(f):
+    """
+    Stream a multi-conversation results file in a single ijson pass
+    
+    Returns:
+        A dict with the header fields read so far and a "conversations"
+        generator that continues the same pass, or None if the file has no
+        conversations list. Header fields stored after the conversations are
+        filled in once the generator has been consumed.
+    """
+    events = ijson.parse(f, use_float=True)
+    data = {}
+    for prefix, event, value in events:
+        if _header_value(prefix, event):
+            data[prefix] = value
+        elif prefix == "conversations" and event == "start_array":
+            data["conversations"] = _stream_conversations(events, data)
+            return data
+    return None
+
+
+def _stream_conversations(events, data):
+    """Yield each conversation from an event stream positioned inside the conversations array"""
+    builder = None
+    for prefix, event, value in events:
+        if prefix == "conversations" and event == "end_array":
+            break
+        if prefix == "conversations.item" and event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        if prefix == "conversations.item" and event in ("end_map", "end_array"):
+            yield builder.value
+    
+    for prefix, event, value in events:
+        if _header_value(prefix, event):
+            data[prefix] = value
+
+
+def _outputs_up_to_date(result_json_path, base_name, output_dir):
+    """
+    True when every clean output exists, is at least as new as the results
+    file, and the metrics-only JSON is in the current format (compact or
+    CLEAN_OUTPUT_PRETTY)
+    """
+    source_mtime = os.path.getmtime(result_json_path)
+    for suffix in ("_metrics_only.json", "_summary.md"):
+        try:
+            if os.path.getmtime(os.path.join(output_dir, base_name + suffix)) < source_mtime:
+                return False
+        except OSError:
+            return False
     
+    # Indented JSON starts with "{\n", compact JSON with '{"' (an empty "{}" fits either)
+    try:
+        with open(os.path.join(output_dir, base_name + "_metrics_only.json"), 'rb') as f:
+            head = f.read(2)
+    except OSError:
+        return False
+    if head[1:2] in (b'\n', b'"') and (head[1:2] == b'\n') != PRETTY_JSON:
+        return False
+    return True
+
+
+def process_result_file(result_json_path, data=None, force=False):
+    """
+    Process a single result JSON and create clean outputs
+    
+    Args:
+        result_json_path: Path to the *_results.json file
+        data: Already-parsed contents of that file; when given the file is
+            not read again
+        force: Regenerate outputs even if they are newer than the results file
+    
+    Returns:
+        False if the outputs were already up to date and nothing was written,
+        True otherwise
+    """
     base_name = os.path.basename(result_json_path).replace('_results.json', '')
     output_dir = os.path.dirname(result_json_path)
     
-    # Check if this is multi-conversation format
-    if "conversations" in data and isinstance(data["conversations"], list):
-        # Multi-conversation format
-        process_multi_conversation_results(data, base_name, output_dir)
+    if data is not None:
+        process_multi_conversation_results(_as_multi_conversation(data), base_name, output_dir)
+        return True
+    
+    if not force and _outputs_up_to_date(result_json_path, base_name, output_dir):
+        return False
+    
+    # Stream multi-conversation files one conversation at a time, so only the
+    # header and the current conversation are ever held in memory
+    with open(result_json_path, 'rb') as f:
+        data = _stream_results(f) if ijson is not None else None
+        if data is not None:
+            process_multi_conversation_results(data, base_name, output_dir)
+            return True
+        
+        # Other layouts are small; load them whole from the same handle
+        f.seek(0)
+        data = _load_json(f)
+    
+    process_multi_conversation_results(_as_multi_conversation(data), base_name, output_dir)
+    return True
+
+
+def _as_multi_conversation(data):
+    """
+    Normalize any supported result layout into the multi-conversation format,
+    so every file goes through the same processing path.
+    
+    Accepts the multi-conversation format ({"conversations": [...]}), a
+    "results" list or a bare list of per-conversation results as written by
+    MultiTurnTester.save_results, and a single conversation result (legacy).
+    """
+    if isinstance(data, list):
+        conversations, header = data, {}
+    elif isinstance(data.get("conversations"), list):
+        return data
+    elif isinstance(data.get("results"), list):
+        conversations, header = data["results"], data
     else:
         # Single conversation format (legacy)
-        process_single_conversation_results(data, base_name, output_dir)
+        conversations, header = [data], data
+    
+    normalized = {
+        "timestamp": header.get("timestamp", ""),
+        "mode": header.get("mode", ""),
+        "total_conversations": len(conversations),
+        "conversations": conversations,
+    }
+    name = header.get("file") or header.get("test_name") or header.get("test_case_name")
+    if name:
+        normalized["file"] = name
+    return normalized
+
+
+def _compare_metrics(model_a_metrics, model_b_metrics):
+    """Say which model scores higher on each metric both were evaluated on"""
+    comparison = {}
+    for metric in sorted(model_a_metrics.keys() & model_b_metrics.keys()):
+        a_score = model_a_metrics[metric]["score"]
+        b_score = model_b_metrics[metric]["score"]
+        # -1, 0 or 1 selects the label without branching on the scores
+        comparison[metric] = _COMPARISON_LABELS[(a_score < b_score) - (a_score > b_score) + 1]
+    return comparison
 
 
 def process_multi_conversation_results(data, base_name, output_dir):
     """Process results with multiple conversations"""
     
-    # Aggregate metrics across all conversations
-    all_model_a_metrics = {}
-    all_model_b_metrics = {}
+    # Status lines are emitted in one write at the end, so output from
+    # parallel workers does not interleave line by line
+    log = []
+    conversations = []
     
     for idx, conv in enumerate(data["conversations"], 1):
-        conv_name = f"Conversation {idx}"
+        model_a_metrics = {}
+        model_b_metrics = {}
         
         # Extract metrics for Model A
         if "model_a_evaluation" in conv:
             model_a_metrics = extract_metrics(conv["model_a_evaluation"]["metrics"])
-            all_model_a_metrics[conv_name] = model_a_metrics
-            print(f"  Conv {idx} Model A: {len(model_a_metrics)} metrics extracted")
+            log.append(f"  Conv {idx} Model A: {len(model_a_metrics)} metrics extracted")
         
         # Extract metrics for Model B
         if "model_b_evaluation" in conv:
             model_b_metrics = extract_metrics(conv["model_b_evaluation"]["metrics"])
-            all_model_b_metrics[conv_name] = model_b_metrics
-            print(f"  Conv {idx} Model B: {len(model_b_metrics)} metrics extracted")
+            log.append(f"  Conv {idx} Model B: {len(model_b_metrics)} metrics extracted")
+        
+        conversations.append({
+            "conversation": f"Conversation {idx}",
+            "model_a_metrics": model_a_metrics,
+            "model_b_metrics": model_b_metrics,
+            "comparison": _compare_metrics(model_a_metrics, model_b_metrics)
+        })
     
-    # Create metrics-only JSON
+    # Create metrics-only JSON (after the loop: a streamed file's header may
+    # only be complete once its conversations have been read)
     metrics_only = {
         "test_name": data.get("file", base_name),
         "timestamp": data.get("timestamp", ""),
         "mode": data.get("mode", ""),
         "total_conversations": data.get("total_conversations", 0),
-        "conversations": []
+        "conversations": conversations
     }
     
-    # Add each conversation's metrics
-    for idx in range(1, data.get("total_conversations", 0) + 1):
-        conv_name = f"Conversation {idx}"
-        conv_metrics = {
-            "conversation": conv_name,
-            "model_a_metrics": all_model_a_metrics.get(conv_name, {}),
-            "model_b_metrics": all_model_b_metrics.get(conv_name, {}),
-            "comparison": {}
-        }
-        
-        # Compare scores
-        for metric in conv_metrics["model_a_metrics"]:
-            if metric in conv_metrics["model_b_metrics"]:
-                a_score = conv_metrics["model_a_metrics"][metric]["score"]
-                b_score = conv_metrics["model_b_metrics"][metric]["score"]
-                if a_score > b_score:
-                    conv_metrics["comparison"][metric] = "Model A scores higher"
-                elif b_score > a_score:
-                    conv_metrics["comparison"][metric] = "Model B scores higher"
-                else:
-                    conv_metrics["comparison"][metric] = "Equivalent performance"
-        
-        metrics_only["conversations"].append(conv_metrics)
-    
     # Save metrics-only
     metrics_path = os.path.join(output_dir, f"{base_name}_metrics_only.json")
-    with open(metrics_path, 'w', encoding='utf-8') as f:
-        json.dump(metrics_only, f, indent=2, ensure_ascii=False)
-    print(f"✓ Created: {metrics_path}")
-    
-    # Create summary markdown
-    md_lines = [
-        f"# Evaluation Summary: {base_name}",
-        f"\n**Timestamp**: {data.get('timestamp', 'N/A')}",
-        f"\n**Mode**: {data.get('mode', 'N/A').upper()}",
-        f"\n**Total Conversations**: {data.get('total_conversations', 0)}",
-    ]
-    
-    for idx, conv_metrics in enumerate(metrics_only["conversations"], 1):
-        md_lines.append(f"\n## Conversation {idx}\n")
-        
-        md_lines.append("### Model A (Base) Metrics\n")
-        for metric, values in sorted(conv_metrics["model_a_metrics"].items()):
-            status = "✅" if values["pass"] else "❌"
-            md_lines.append(f"- {status} **{metric}**: {values['score']:.4f}")
-        
-        md_lines.append("\n### Model B (Finetuned) Metrics\n")
-        for metric, values in sorted(conv_metrics["model_b_metrics"].items()):
-            status = "✅" if values["pass"] else "❌"
-            md_lines.append(f"- {status} **{metric}**: {values['score']:.4f}")
-        
-        if conv_metrics["comparison"]:
-            md_lines.append("\n### Comparative Performance\n")
-            for metric, comparison in sorted(conv_metrics["comparison"].items()):
-                md_lines.append(f"- **{metric}**: {comparison}")
+    _write_json(metrics_path, metrics_only)
+    log.append(f"✓ Created: {metrics_path}")
+    
+    # Metric names repeat across conversations, so sort them once for the
+    # whole file; comparisons are already built in sorted order
+    metric_order = sorted({metric for conv_metrics in conversations
+                           for side in ("model_a_metrics", "model_b_metrics")
+                           for metric in conv_metrics[side]})
     
-    # Save summary
+    # Stream the summary markdown straight into a buffered file; every line
+    # after the title is written with its leading separator. newline='' keeps
+    # '\n' line endings on every platform
     summary_path = os.path.join(output_dir, f"{base_name}_summary.md")
-    with open(summary_path, 'w') as f:
-        f.write('\n'.join(md_lines))
-    print(f"✓ Created: {summary_path}")
+    with open(summary_path, 'w', encoding='utf-8', newline='', buffering=1 << 16) as f:
+        w = f.write
+        w(f"""# Evaluation Summary: {base_name}
+
+**Timestamp**: {data.get('timestamp', 'N/A')}
+
+**Mode**: {data.get('mode', 'N/A').upper()}
+
+**Total Conversations**: {data.get('total_conversations', 0)}""")
+        
+        for idx, conv_metrics in enumerate(conversations, 1):
+            w(f"\n\n## Conversation {idx}\n\n### Model A (Base) Metrics\n")
+            w(_metric_lines(conv_metrics["model_a_metrics"], metric_order))
+            w("\n\n### Model B (Finetuned) Metrics\n")
+            w(_metric_lines(conv_metrics["model_b_metrics"], metric_order))
+            
+            if conv_metrics["comparison"]:
+                w("\n\n### Comparative Performance\n")
+                w("".join(f"\n- **{metric}**: {comparison}"
+                          for metric, comparison in conv_metrics["comparison"].items()))
+    log.append(f"✓ Created: {summary_path}")
+    print('\n'.join(log), flush=True)
 
 
 def main():
-    """Process all results in evaluation_result/ folder"""
+    """
+    Process all results in evaluation_result/ folder
+    
+    Files whose clean outputs are newer than the results are skipped;
+    pass --force to regenerate everything.
+    """
+    logging.basicConfig(format="%(message)s")
     result_dir = "evaluation_result"
+    force = '--force' in sys.argv
     
     if not os.path.exists(result_dir):
         print(f"❌ No {result_dir} directory found")
         return
     
-    result_files = [f for f in os.listdir(result_dir) if f.endswith('_results.json')]
+    with os.scandir(result_dir) as entries:
+        result_paths = [entry.path for entry in entries
+                        if entry.name.endswith('_results.json') and entry.is_file()]
     
-    if not result_files:
+    if not result_paths:
         print(f"❌ No result files found in {result_dir}/")
         return
     
-    print(f"\n📊 Processing {len(result_files)} result file(s)...\n")
+    print(f"\n📊 Processing {len(result_paths)} result file(s)...\n")
     
-    for result_file in result_files:
-        result_path = os.path.join(result_dir, result_file)
-        try:
-            print(f"Processing: {result_file}")
-            process_result_file(result_path)
-            print()
-        except Exception as e:
-            print(f"❌ Error processing {result_file}: {e}")
-            import traceback
-            traceback.print_exc()
+    # Files are independent and parsing is CPU-bound, so process them in parallel
+    max_workers = min(len(result_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_result_file, path, force=force): path
+                   for path in result_paths}
+        for future in as_completed(futures):
+            result_file = os.path.basename(futures[future])
+            try:
+                if future.result():
+                    print(f"Processed: {result_file}\n")
+                else:
+                    print(f"Up to date, skipped: {result_file}\n")
+            except Exception as e:
+                logger.exception("❌ Error processing %s: %s", result_file, e)
     
     print("✅ Clean outputs generated\n")
 
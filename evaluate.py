@@ -14,20 +14,46 @@ Excel Format:
 import argparse
 import sys
 import os
-import glob
 import json
-import pandas as pd
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 import logging
 
-# Import our modules
-from multi_turn_testing import MultiTurnTester, deepeval_to_dict
-from excel_loader import ExcelConversationLoader
+try:
+    import orjson
+except ImportError:  # Optional faster JSON serializer
+    orjson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # Optional faster Excel writer
+    xlsxwriter = None
+
+# Import our modules (pandas and deepeval are imported where they are used,
+# so --help and an empty input/ return without loading them)
 from config import BASE_MODEL, FINETUNED_MODEL
-from deepeval.test_case import ConversationalTestCase, Turn
 from logger_config import setup_logger, log_section, log_subsection
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from multi_turn_testing import MultiTurnTester
+
+logger = logging.getLogger(__name__)
+
+# Conversations evaluated at once within a file. Opt-in: every conversation
+# runs its own deepeval.evaluate(), which shares one process-wide test run
+# and its .deepeval files, so the default keeps those calls sequential
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "1"))
+
+# Generated conversations are cached here (under the output directory)
+CACHE_DIRNAME = ".cache"
+
+# Generated turns kept in test cases (system messages are dropped)
+_KEEP_ROLES = frozenset(("user", "assistant"))
+
 
 def ensure_directories():
     """Create necessary directories"""
@@ -35,30 +61,132 @@ def ensure_directories():
     os.makedirs("evaluation_result", exist_ok=True)
 
 
-def detect_mode(excel_path: str) -> str:
+def detect_mode(df: "pd.DataFrame") -> str:
     """
     Detect evaluation mode based on Excel columns
     
+    Args:
+        df: The Excel sheet, already loaded with read_excel_sheet
+    
     Returns:
         'prerecorded' if Model A/B Response columns exist
         'generate' if only User Query exists
     """
-    df = pd.read_excel(excel_path)
     has_model_a = "Model A Response" in df.columns
     has_model_b = "Model B Response" in df.columns
     
     if has_model_a and has_model_b:
-        # Check if responses exist
-        has_data = False
-        for idx, row in df.iterrows():
-            if pd.notna(row.get("Model A Response")) and pd.notna(row.get("Model B Response")):
-                has_data = True
-                break
+        # Check if any row has both responses
+        has_data = bool((df["Model A Response"].notna() & df["Model B Response"].notna()).any())
         return "prerecorded" if has_data else "generate"
     else:
         return "generate"
 
 
+def _model_cache_config(model_config: Dict) -> Dict:
+    """Model settings that affect generated responses (the API key does not)"""
+    return {k: v for k, v in model_config.items() if k != "api_key"}
+
+
+def _has_generation_error(conversation: List[Dict], prompt_turns: List[Dict]) -> bool:
+    """
+    Whether any generated assistant turn is an API error
+    
+    ModelWrapper.generate_response returns "Error: ..." as the content when a
+    call fails. Turns passed in the prompt come back as the same objects, so
+    only the newly generated turns are checked.
+    """
+    prompt_ids = {id(turn) for turn in prompt_turns}
+    return any(
+        id(turn) not in prompt_ids and turn["role"] == "assistant"
+        and str(turn["content"]).startswith("Error: ")
+        for turn in conversation
+    )
+
+
+def generate_conversations_cached(
+    tester: "MultiTurnTester",
+    full_conversation: List[Dict],
+    system_prompt: str,
+    output_dir: str,
+    use_cache: bool = True
+) -> tuple:
+    """
+    Generate (base_conversation, finetuned_conversation), reusing earlier runs
+    
+    Responses are cached on disk under output_dir/.cache, keyed by a hash of
+    both model configurations, the system prompt and the conversation, so
+    re-running the same Excel file skips the model calls.
+    """
+    if not use_cache:
+        return tester.generate_conversations(full_conversation)
+    
+    key = hashlib.sha256(json.dumps(
+        [_model_cache_config(BASE_MODEL), _model_cache_config(FINETUNED_MODEL),
+         system_prompt, full_conversation],
+        sort_keys=True
+    ).encode("utf-8")).hexdigest()
+    cache_dir = os.path.join(output_dir, CACHE_DIRNAME)
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        print("♻️  Using cached responses\n")
+        return cached["base"], cached["finetuned"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    base_conv, finetuned_conv = tester.generate_conversations(full_conversation)
+    
+    # Never cache a failed call: the next run should retry it
+    if (_has_generation_error(base_conv, full_conversation)
+            or _has_generation_error(finetuned_conv, full_conversation)):
+        logger.warning("⚠️  Not caching responses: a model call failed")
+        return base_conv, finetuned_conv
+    
+    # Write to a temporary file and rename it, so a crash or a concurrent run
+    # never leaves a truncated cache entry behind
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"base": base_conv, "finetuned": finetuned_conv}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.warning("⚠️  Could not cache responses: %s", e)
+    
+    return base_conv, finetuned_conv
+
+
+def evaluate_test_case_pairs(
+    tester: "MultiTurnTester",
+    test_case_pairs: List[tuple],
+    filename: str
+) -> List[Dict]:
+    """
+    Evaluate (Model A, Model B) test case pairs concurrently
+    
+    Used when EVAL_CONCURRENCY > 1: up to that many conversations are
+    evaluated at once on threads. Results are returned in the order of the pairs.
+    """
+    def evaluate(indexed_pair):
+        idx, (model_a_test_case, model_b_test_case) = indexed_pair
+        return tester.evaluate_from_excel_test_cases(
+            model_a_test_case,
+            model_b_test_case,
+            f"{filename} - Conversation {idx}"
+        )
+    
+    workers = max(1, min(EVAL_CONCURRENCY, len(test_case_pairs)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(evaluate, enumerate(test_case_pairs, 1)))
+
+
 def evaluate_file(
     excel_path: str,
     mode: str,
@@ -66,13 +194,27 @@ def evaluate_file(
     judge_model: str,
     use_all_metrics: bool,
     output_dir: str,
-    verbose_mode: bool = False
+    verbose_mode: bool = False,
+    df: "pd.DataFrame" = None,
+    use_cache: bool = True,
+    tester: "MultiTurnTester" = None
 ) -> Dict:
     """
     Evaluate conversations from Excel file
     Each row = one separate conversation
+    
+    df is the already-loaded sheet, if the caller has one; otherwise the
+    Excel file is read here. It is read at most once either way.
+    use_cache reuses responses generated by earlier runs (generate mode).
+    tester is shared across files when given; otherwise one is created here.
     """
+    import pandas as pd
+    from deepeval.test_case import ConversationalTestCase, Turn
+    from multi_turn_testing import MultiTurnTester, deepeval_to_dict
+    from excel_loader import ExcelConversationLoader
+    
     filename = os.path.basename(excel_path)
+    stem = os.path.splitext(filename)[0]
     print(f"\n{'='*80}")
     print(f"EVALUATING: {filename}")
     print(f"{'='*80}\n")
@@ -80,15 +222,16 @@ def evaluate_file(
     print()
     
     # Initialize tester
-    tester = MultiTurnTester(
-        BASE_MODEL,
-        FINETUNED_MODEL,
-        judge_model=judge_model,
-        use_all_metrics=use_all_metrics,
-        verbose_mode=verbose_mode
-    )
+    if tester is None:
+        tester = MultiTurnTester(
+            BASE_MODEL,
+            FINETUNED_MODEL,
+            judge_model=judge_model,
+            use_all_metrics=use_all_metrics,
+            verbose_mode=verbose_mode
+        )
     
-    loader = ExcelConversationLoader(excel_path)
+    loader = ExcelConversationLoader(excel_path, df=df)
     
     if mode == "prerecorded":
         print("✓ Using pre-recorded responses from Excel\n")
@@ -102,7 +245,9 @@ def evaluate_file(
         
         print(f"Loaded {len(test_case_pairs)} conversation(s)\n")
         
-        # Evaluate each conversation
+        # Evaluate each conversation as it is prepared; with EVAL_CONCURRENCY > 1,
+        # prepare them all first and evaluate them concurrently afterwards
+        concurrent = EVAL_CONCURRENCY > 1 and len(test_case_pairs) > 1
         all_results = []
         for idx, (model_a_test_case, model_b_test_case) in enumerate(test_case_pairs, 1):
             print(f"\n{'='*80}")
@@ -123,13 +268,17 @@ def evaluate_file(
             print(f"📋 Chatbot Role: {model_a_test_case.chatbot_role[:100]}..." if len(model_a_test_case.chatbot_role) > 100 else f"📋 Chatbot Role: {model_a_test_case.chatbot_role}")
             print()
             
-            # Evaluate
-            result = tester.evaluate_from_excel_test_cases(
-                model_a_test_case,
-                model_b_test_case,
-                f"{filename} - Conversation {idx}"
-            )
-            all_results.append(result)
+            if not concurrent:
+                # Evaluate
+                result = tester.evaluate_from_excel_test_cases(
+                    model_a_test_case,
+                    model_b_test_case,
+                    f"{filename} - Conversation {idx}"
+                )
+                all_results.append(result)
+        
+        if concurrent:
+            all_results = evaluate_test_case_pairs(tester, test_case_pairs, filename)
         
         # Save combined results
         combined_results = {
@@ -153,9 +302,13 @@ def evaluate_file(
         
         print(f"Loaded {len(conversations)} conversation(s)\n")
         
-        # Evaluate each conversation
+        # Generate and evaluate each conversation in turn; with EVAL_CONCURRENCY > 1,
+        # generate them all first and evaluate them concurrently afterwards
+        concurrent = EVAL_CONCURRENCY > 1 and len(conversations) > 1
         all_results = []
+        test_case_pairs = []
         generated_data = []
+        shared_ctx = [system_prompt] if system_prompt else None
         
         for idx, conv_data in enumerate(conversations, 1):
             print(f"\n{'='*80}")
@@ -184,43 +337,38 @@ def evaluate_file(
             
             # Generate responses
             print("🤖 Generating responses...\n")
-            base_conv, finetuned_conv = tester.generate_conversations(full_conversation)
+            base_conv, finetuned_conv = generate_conversations_cached(
+                tester, full_conversation, system_prompt, output_dir, use_cache
+            )
             
             # Convert to test cases (filter out system messages)
-            base_turns = [Turn(role=t["role"], content=t["content"]) for t in base_conv if t["role"] in ["user", "assistant"]]
-            finetuned_turns = [Turn(role=t["role"], content=t["content"]) for t in finetuned_conv if t["role"] in ["user", "assistant"]]
-            
-            # Create test cases
-            model_a_test_case = ConversationalTestCase(
-                turns=base_turns,
-                context=[system_prompt] if system_prompt else None,
-                **metadata
-            )
+            base_turns = [Turn(role=t["role"], content=t["content"]) for t in base_conv if t["role"] in _KEEP_ROLES]
+            finetuned_turns = [Turn(role=t["role"], content=t["content"]) for t in finetuned_conv if t["role"] in _KEEP_ROLES]
             
-            model_b_test_case = ConversationalTestCase(
-                turns=finetuned_turns,
-                context=[system_prompt] if system_prompt else None,
-                **metadata
-            )
+            # Settings shared by both test cases; override chatbot_role with
+            # the system prompt if the default is being used
+            shared_meta = dict(metadata, context=shared_ctx)
+            if system_prompt and (not shared_meta["chatbot_role"] or shared_meta["chatbot_role"] == "helpful AI assistant"):
+                shared_meta["chatbot_role"] = system_prompt
             
-            # Override chatbot_role with system prompt if default is being used
-            if system_prompt:
-                if not model_a_test_case.chatbot_role or model_a_test_case.chatbot_role == "helpful AI assistant":
-                    model_a_test_case.chatbot_role = system_prompt
-                if not model_b_test_case.chatbot_role or model_b_test_case.chatbot_role == "helpful AI assistant":
-                    model_b_test_case.chatbot_role = system_prompt
+            # Create test cases
+            model_a_test_case = ConversationalTestCase(turns=base_turns, **shared_meta)
+            model_b_test_case = ConversationalTestCase(turns=finetuned_turns, **shared_meta)
             
             # Print chatbot role being used
             print(f"📋 Chatbot Role: {model_a_test_case.chatbot_role[:100]}..." if len(model_a_test_case.chatbot_role) > 100 else f"📋 Chatbot Role: {model_a_test_case.chatbot_role}")
             print()
             
-            # Evaluate
-            result = tester.evaluate_from_excel_test_cases(
-                model_a_test_case,
-                model_b_test_case,
-                f"{filename} - Conversation {idx}"
-            )
-            all_results.append(result)
+            if concurrent:
+                test_case_pairs.append((model_a_test_case, model_b_test_case))
+            else:
+                # Evaluate
+                result = tester.evaluate_from_excel_test_cases(
+                    model_a_test_case,
+                    model_b_test_case,
+                    f"{filename} - Conversation {idx}"
+                )
+                all_results.append(result)
             
             # Store generated responses
             model_a_response = [t.content for t in base_turns if t.role == "assistant"][-1] if base_turns else ""
@@ -233,15 +381,23 @@ def evaluate_file(
                 "model_b_response": model_b_response
             })
         
-        # Save generated responses to Excel
-        df = pd.read_excel(excel_path)
-        for gen_data in generated_data:
-            idx = gen_data["row_index"]
-            df.at[idx, "Model A Response"] = gen_data["model_a_response"]
-            df.at[idx, "Model B Response"] = gen_data["model_b_response"]
+        if concurrent:
+            all_results = evaluate_test_case_pairs(tester, test_case_pairs, filename)
         
-        excel_out_path = os.path.join(output_dir, filename.replace('.xlsx', '_with_responses.xlsx'))
-        df.to_excel(excel_out_path, index=False)
+        # Save generated responses to Excel (the loader's sheet is never modified
+        # while loading, so it is still the file as read)
+        df = loader.df
+        if generated_data:
+            rows = [gen_data["row_index"] for gen_data in generated_data]
+            for column, key in (("Model A Response", "model_a_response"),
+                                ("Model B Response", "model_b_response")):
+                # Empty response columns are read as float (or are missing); hold text instead
+                df[column] = df[column].astype(object) if column in df.columns else pd.Series(dtype=object)
+                df.loc[rows, column] = [gen_data[key] for gen_data in generated_data]
+        
+        excel_out_path = os.path.join(output_dir, f"{stem}_with_responses.xlsx")
+        df.to_excel(excel_out_path, index=False,
+                    engine='xlsxwriter' if xlsxwriter is not None else 'openpyxl')
         print(f"\n✓ Saved Excel with responses: {excel_out_path}\n")
         
         # Save combined results
@@ -255,18 +411,22 @@ def evaluate_file(
         }
     
     # Save JSON results
-    json_path = os.path.join(output_dir, filename.replace('.xlsx', '_results.json'))
+    json_path = os.path.join(output_dir, f"{stem}_results.json")
     # Convert DeepEval objects to clean dictionaries
     clean_results = deepeval_to_dict(combined_results)
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(clean_results, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(json_path, 'wb') as f:
+            f.write(orjson.dumps(clean_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(clean_results, f, indent=2, ensure_ascii=False)
     
     print(f"\n✅ Results saved: {json_path}")
     
-    # Create clean outputs
+    # Create clean outputs from the results already in memory
     try:
         from create_clean_output import process_result_file
-        process_result_file(json_path)
+        process_result_file(json_path, clean_results)
     except Exception as e:
         print(f"⚠️  Could not create clean outputs: {e}")
     
@@ -305,13 +465,50 @@ Each ROW in Excel = One separate conversation to evaluate
                         help='Output directory (default: evaluation_result)')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Enable verbose mode to see intermediate metric calculation steps')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Excel files to evaluate concurrently (default: 1, one at a time)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call the models in generate mode, ignoring cached responses')
     
     return parser.parse_args()
 
 
+def _evaluate_excel_file(excel_file: str, args, system_prompt: str, use_all_metrics: bool,
+                         tester: "MultiTurnTester"):
+    """Detect the mode of one Excel file and evaluate it, reporting any error"""
+    try:
+        from excel_loader import read_excel_sheet
+        
+        # Read the sheet once; mode detection and evaluation share it
+        df = read_excel_sheet(excel_file)
+        
+        # Determine mode
+        if args.mode == 'auto':
+            mode = detect_mode(df)
+        else:
+            mode = args.mode
+        
+        # Evaluate
+        evaluate_file(
+            excel_file,
+            mode,
+            system_prompt,
+            args.judge,
+            use_all_metrics,
+            args.output,
+            verbose_mode=args.verbose,
+            df=df,
+            use_cache=not args.no_cache,
+            tester=tester
+        )
+    except Exception as e:
+        logger.exception("\n❌ Error (%s): %s\n", os.path.basename(excel_file), e)
+
+
 def main():
     """Main entry point"""
     args = parse_args()
+    logging.basicConfig(format="%(message)s")
     
     print("\n" + "="*80)
     print("DEEPEVAL MULTI-TURN EVALUATION")
@@ -335,7 +532,10 @@ def main():
             elif os.path.exists(os.path.join('input', f)):
                 excel_files.append(os.path.join('input', f))
     else:
-        excel_files = glob.glob("input/*.xlsx")
+        with os.scandir("input") as entries:
+            excel_files = [entry.path for entry in entries
+                           if entry.name.lower().endswith(('.xlsx', '.xls')) and not entry.name.startswith('.')
+                           and entry.is_file()]
     
     if not excel_files:
         print("❌ No Excel files found")
@@ -354,33 +554,34 @@ def main():
     print(f"   Judge Model: {args.judge}")
     print(f"   Metrics: {'All 7' if use_all_metrics else 'Only 4 built-in'}")
     print(f"   Mode: {args.mode.upper()}")
+    # Files can be evaluated concurrently (opt-in): each one is dominated by
+    # model and judge API calls, so threads overlap the network waits
+    workers = max(1, min(args.workers, len(excel_files)))
     print(f"   Verbose: {'ON (shows intermediate steps)' if args.verbose else 'OFF'}")
+    print(f"   Workers: {workers}")
     print(f"\n💡 Note: Each ROW in Excel = One conversation\n")
     
-    # Process each file
-    for excel_file in excel_files:
-        try:
-            # Determine mode
-            if args.mode == 'auto':
-                mode = detect_mode(excel_file)
-            else:
-                mode = args.mode
-            
-            # Evaluate
-            evaluate_file(
-                excel_file,
-                mode,
-                system_prompt,
-                args.judge,
-                use_all_metrics,
-                args.output,
-                verbose_mode=args.verbose
-            )
-        except Exception as e:
-            print(f"\n❌ Error: {e}\n")
-            import traceback
-            traceback.print_exc()
-            continue
+    # One tester (and its model clients) serves every file. Results are
+    # returned per file, so the tester does not also keep them for the whole run
+    from multi_turn_testing import MultiTurnTester
+    tester = MultiTurnTester(
+        BASE_MODEL,
+        FINETUNED_MODEL,
+        judge_model=args.judge,
+        use_all_metrics=use_all_metrics,
+        verbose_mode=args.verbose,
+        keep_results=False
+    )
+    
+    if workers == 1:
+        for excel_file in excel_files:
+            _evaluate_excel_file(excel_file, args, system_prompt, use_all_metrics, tester)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(
+                lambda excel_file: _evaluate_excel_file(excel_file, args, system_prompt, use_all_metrics, tester),
+                excel_files
+            ))
     
     print("\n" + "="*80)
     print("✅ EVALUATION COMPLETE")
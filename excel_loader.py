@@ -11,15 +11,103 @@ Each ROW in Excel represents a SEPARATE conversation:
 
 import pandas as pd
 import json
-from typing import List, Tuple
+from functools import lru_cache
+from itertools import repeat
+from typing import Iterator, List, Tuple
 from deepeval.test_case import ConversationalTestCase, Turn
 
+try:
+    import orjson
+except ImportError:  # Optional faster JSON parser
+    orjson = None
+
+try:
+    import python_calamine
+except ImportError:  # Optional faster Excel reader (pandas engine='calamine')
+    python_calamine = None
+
+# pandas gained engine='calamine' in 2.2; older versions fall back to openpyxl
+_USE_CALAMINE = (python_calamine is not None
+                 and tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2))
+
+# Turns kept from the Initial Conversation column
+_KEEP_ROLES = frozenset(("user", "assistant"))
+
+
+def read_excel_sheet(excel_path: str) -> pd.DataFrame:
+    """
+    Read the first sheet of an Excel file
+    
+    Uses the calamine engine when python-calamine is installed (pandas 2.2+), otherwise
+    pandas' default (openpyxl). All columns are kept: generate mode writes
+    the sheet back out with the responses filled in.
+    """
+    if _USE_CALAMINE:
+        return pd.read_excel(excel_path, engine="calamine")
+    return pd.read_excel(excel_path)
+
+
+@lru_cache(maxsize=4096)
+def _parse_initial_turns(initial_conv_str: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Parse an Initial Conversation cell into (role, content) pairs
+    
+    Only user and assistant turns are kept; invalid JSON gives no turns.
+    Cached on the raw string, since rows often share the same prior context.
+    """
+    try:
+        initial_conv_json = orjson.loads(initial_conv_str) if orjson is not None else json.loads(initial_conv_str)
+    except ValueError:
+        return ()  # No initial conversation or invalid JSON
+    
+    initial_turns = []
+    for turn_data in initial_conv_json:
+        role = turn_data.get("role", "user")
+        content = turn_data.get("content", "")
+        if role in _KEEP_ROLES:
+            initial_turns.append((role, content))
+    return tuple(initial_turns)
+
+
+@lru_cache(maxsize=4096)
+def _initial_turn_objects(initial_conv_str: str) -> Tuple[Turn, ...]:
+    """Initial Conversation cell as Turn objects, shared by every row with the same cell"""
+    return tuple(Turn(role=role, content=content) for role, content in _parse_initial_turns(initial_conv_str))
+
+
+def _is_missing(value) -> bool:
+    """Empty cell check for raw column values (None, or NaN/NaT, which != themselves)"""
+    return value is None or value != value
+
 
 class ExcelConversationLoader:
-    def __init__(self, excel_path: str):
-        """Load Excel file"""
+    def __init__(self, excel_path: str, df: pd.DataFrame = None):
+        """Use df if the caller has already read the Excel file; otherwise it is read on first use"""
         self.excel_path = excel_path
-        self.df = pd.read_excel(excel_path)
+        self._df = df
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        """The sheet being loaded, read from excel_path the first time it is needed"""
+        if self._df is None:
+            self._df = read_excel_sheet(self.excel_path)
+        return self._df
+    
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+    
+    def _column(self, name: str, index=None):
+        """
+        Raw values of a column, for zipping row by row
+        
+        Restricted to the row labels in index when given; a missing column
+        yields None for every row.
+        """
+        if name not in self.df.columns:
+            return repeat(None)
+        column = self.df[name] if index is None else self.df.loc[index, name]
+        return column.to_numpy()
     
     def get_conversations_for_generation(self) -> List[dict]:
         """
@@ -33,28 +121,27 @@ class ExcelConversationLoader:
         """
         conversations = []
         
-        for idx, row in self.df.iterrows():
-            # Get user query
-            if "User Query" not in self.df.columns or pd.isna(row["User Query"]):
-                continue
-            
-            user_query = str(row["User Query"]).strip()
-            if not user_query:
-                continue
-            
+        if "User Query" not in self.df.columns:
+            return conversations
+        
+        # Rows with a non-empty user query, selected in one vectorized pass
+        user_queries = self.df["User Query"].dropna().astype(str).str.strip()
+        user_queries = user_queries[user_queries != ""]
+        
+        rows = zip(
+            user_queries.items(),
+            self._column("Initial Conversation", user_queries.index),
+            self._column("Chatbot Role", user_queries.index),
+            self._column("Scenario", user_queries.index),
+            self._column("Expected Outcome", user_queries.index),
+        )
+        
+        for (idx, user_query), initial_conv, chatbot_role, scenario, expected_outcome in rows:
             # Parse initial conversation (JSON)
             initial_turns = []
-            if "Initial Conversation" in self.df.columns and pd.notna(row["Initial Conversation"]):
-                initial_conv_str = str(row["Initial Conversation"]).strip()
-                try:
-                    initial_conv_json = json.loads(initial_conv_str)
-                    for turn_data in initial_conv_json:
-                        role = turn_data.get("role", "user")
-                        content = turn_data.get("content", "")
-                        if role in ["user", "assistant"]:
-                            initial_turns.append({"role": role, "content": content})
-                except (json.JSONDecodeError, ValueError):
-                    pass  # No initial conversation or invalid JSON
+            if not _is_missing(initial_conv):
+                initial_turns = [{"role": role, "content": content}
+                                 for role, content in _parse_initial_turns(str(initial_conv).strip())]
             
             # Get metadata
             # chatbot_role is REQUIRED for Role Adherence metric
@@ -64,12 +151,12 @@ class ExcelConversationLoader:
                 "expected_outcome": None
             }
             
-            if "Chatbot Role" in self.df.columns and pd.notna(row["Chatbot Role"]):
-                metadata["chatbot_role"] = str(row["Chatbot Role"]).strip()
-            if "Scenario" in self.df.columns and pd.notna(row["Scenario"]):
-                metadata["scenario"] = str(row["Scenario"]).strip()
-            if "Expected Outcome" in self.df.columns and pd.notna(row["Expected Outcome"]):
-                metadata["expected_outcome"] = str(row["Expected Outcome"]).strip()
+            if not _is_missing(chatbot_role):
+                metadata["chatbot_role"] = str(chatbot_role).strip()
+            if not _is_missing(scenario):
+                metadata["scenario"] = str(scenario).strip()
+            if not _is_missing(expected_outcome):
+                metadata["expected_outcome"] = str(expected_outcome).strip()
             
             conversations.append({
                 "initial_turns": initial_turns,
@@ -87,67 +174,67 @@ class ExcelConversationLoader:
         Returns:
             List of (model_a_test_case, model_b_test_case) tuples
         """
-        test_cases = []
+        return list(self._iter_conversations_prerecorded())
+    
+    def _iter_conversations_prerecorded(self) -> Iterator[Tuple[ConversationalTestCase, ConversationalTestCase]]:
+        """Yield (model_a_test_case, model_b_test_case) for each row with pre-recorded responses"""
+        # A user query and both responses are needed for any row to count
+        if not {"User Query", "Model A Response", "Model B Response"}.issubset(self.df.columns):
+            return
         
-        for idx, row in self.df.iterrows():
-            # Get user query
-            if "User Query" not in self.df.columns or pd.isna(row["User Query"]):
-                continue
-            
-            user_query = str(row["User Query"]).strip()
-            if not user_query:
-                continue
-            
-            # Get model responses
-            if "Model A Response" not in self.df.columns or pd.isna(row["Model A Response"]):
-                continue
-            if "Model B Response" not in self.df.columns or pd.isna(row["Model B Response"]):
-                continue
-            
-            model_a_response = str(row["Model A Response"]).strip()
-            model_b_response = str(row["Model B Response"]).strip()
-            
-            if not model_a_response or not model_b_response:
-                continue
-            
-            # Parse initial conversation
-            initial_turns = []
-            if "Initial Conversation" in self.df.columns and pd.notna(row["Initial Conversation"]):
-                initial_conv_str = str(row["Initial Conversation"]).strip()
-                try:
-                    initial_conv_json = json.loads(initial_conv_str)
-                    for turn_data in initial_conv_json:
-                        role = turn_data.get("role", "user")
-                        content = turn_data.get("content", "")
-                        if role in ["user", "assistant"]:
-                            initial_turns.append(Turn(role=role, content=content))
-                except (json.JSONDecodeError, ValueError):
-                    pass
+        # Rows with a non-empty user query and both responses, selected in
+        # vectorized passes
+        complete = (self.df["User Query"].notna()
+                    & self.df["Model A Response"].notna()
+                    & self.df["Model B Response"].notna())
+        user_queries, model_a_responses, model_b_responses = (
+            self.df.loc[complete, column].astype(str).str.strip()
+            for column in ("User Query", "Model A Response", "Model B Response")
+        )
+        keep = (user_queries != "") & (model_a_responses != "") & (model_b_responses != "")
+        index = keep.index[keep]
+        
+        # Walk the needed columns side by side instead of boxing each row
+        rows = zip(
+            user_queries[keep],
+            model_a_responses[keep],
+            model_b_responses[keep],
+            self._column("Initial Conversation", index),
+            self._column("Chatbot Role", index),
+            self._column("Scenario", index),
+            self._column("Expected Outcome", index),
+        )
+        
+        for user_query, model_a_response, model_b_response, initial_conv, chatbot_role, scenario, expected_outcome in rows:
+            # Parse initial conversation (the Turn objects are shared, not copied)
+            initial_turns = ()
+            if not _is_missing(initial_conv):
+                initial_turns = _initial_turn_objects(str(initial_conv).strip())
             
             # Build conversation turns for Model A
-            model_a_turns = initial_turns.copy()
-            model_a_turns.append(Turn(role="user", content=user_query))
-            model_a_turns.append(Turn(role="assistant", content=model_a_response))
+            model_a_turns = [*initial_turns,
+                             Turn(role="user", content=user_query),
+                             Turn(role="assistant", content=model_a_response)]
             
             # Build conversation turns for Model B
-            model_b_turns = initial_turns.copy()
-            model_b_turns.append(Turn(role="user", content=user_query))
-            model_b_turns.append(Turn(role="assistant", content=model_b_response))
+            model_b_turns = [*initial_turns,
+                             Turn(role="user", content=user_query),
+                             Turn(role="assistant", content=model_b_response)]
             
             # Get metadata
             metadata = {}
             
             # chatbot_role is REQUIRED for Role Adherence metric
-            if "Chatbot Role" in self.df.columns and pd.notna(row["Chatbot Role"]):
-                metadata["chatbot_role"] = str(row["Chatbot Role"]).strip()
+            if not _is_missing(chatbot_role):
+                metadata["chatbot_role"] = str(chatbot_role).strip()
             else:
                 # Default chatbot role if not provided
                 metadata["chatbot_role"] = "helpful AI assistant"
             
-            if "Scenario" in self.df.columns and pd.notna(row["Scenario"]):
-                metadata["scenario"] = str(row["Scenario"]).strip()
-            if "Expected Outcome" in self.df.columns and pd.notna(row["Expected Outcome"]):
-                metadata["expected_outcome"] = str(row["Expected Outcome"]).strip()
+            if not _is_missing(scenario):
+                metadata["scenario"] = str(scenario).strip()
+            if not _is_missing(expected_outcome):
+                metadata["expected_outcome"] = str(expected_outcome).strip()
             
             # Create test cases
             model_a_test_case = ConversationalTestCase(
@@ -160,17 +247,15 @@ class ExcelConversationLoader:
                 **metadata
             )
             
-            test_cases.append((model_a_test_case, model_b_test_case))
-        
-        return test_cases
+            yield model_a_test_case, model_b_test_case
     
     def parse_conversation_from_excel(self) -> Tuple[ConversationalTestCase, ConversationalTestCase]:
         """
         Legacy method for backward compatibility
-        Returns the first conversation pair
+        Returns the first conversation pair (later rows are not built)
         """
-        test_cases = self.get_conversations_prerecorded()
-        if test_cases:
-            return test_cases[0]
+        first_pair = next(self._iter_conversations_prerecorded(), None)
+        if first_pair is not None:
+            return first_pair
         else:
             raise ValueError("No valid conversations found in Excel")
@@ -0,0 +1,42 @@
+"""
+Metric Parsing Helpers
+Shared by create_clean_output.py and analysis.py to read metrics from results
+"""
+
+import re
+
+# Legacy MetricData(...) string format, tokenized in a single scan over the
+# whole string: a "start" match opens a new metric section and m.lastgroup
+# names the field every other match belongs to. The reason is an unrolled
+# quoted-string loop: [^'] and '' never overlap, so the match is linear and
+# runs to the closing quote instead of stopping at an escaped ''
+METRIC_RE = re.compile(
+    r"(?P<start>MetricData\()"
+    r"|\b(?:name='(?P<name>[^']+)'"
+    r"|score=(?P<score>[0-9.]+)"
+    r"|success=(?P<success>True|False)"
+    r"|threshold=(?P<threshold>[0-9.]+)"
+    r"|reason='(?P<reason>[^']*(?:''[^']*)*)')"
+)
+
+
+def get_field(obj, name, default=None):
+    """Read a field from either a dict or an object (e.g. a DeepEval MetricData)"""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def metric_sections(metrics_str):
+    """Yield the fields of each MetricData(...) in metrics_str, first occurrence of each winning"""
+    fields = None
+    for match in METRIC_RE.finditer(metrics_str):
+        group = match.lastgroup
+        if group == "start":
+            if fields is not None:
+                yield fields
+            fields = {}
+        elif fields is not None:
+            fields.setdefault(group, match.group(group))
+    if fields is not None:
+        yield fields
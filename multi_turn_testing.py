@@ -55,12 +55,13 @@ def deepeval_to_dict(obj: Any) -> Any:
 class MultiTurnTester:
     """Framework for testing multi-turn conversations"""
     
-    def __init__(self, base_model_config: dict, finetuned_model_config: dict, judge_model: str = "gpt-4", use_all_metrics: bool = True, verbose_mode: bool = False):
+    def __init__(self, base_model_config: dict, finetuned_model_config: dict, judge_model: str = "gpt-4", use_all_metrics: bool = True, verbose_mode: bool = False, keep_results: bool = True):
         self.base_model = ModelWrapper(base_model_config)
         self.finetuned_model = ModelWrapper(finetuned_model_config)
         self.judge_model = judge_model  # Store judge model for all evaluations
         self.use_all_metrics = use_all_metrics  # Whether to use all 7 metrics or just original 4
         self.verbose_mode = verbose_mode  # Whether to print intermediate metric calculation steps
+        self.keep_results = keep_results  # Whether Excel evaluations are also collected in self.results
         self.results = []
     
     def generate_conversations(self, user_turns: List[Dict[str, str]]) -> tuple:
@@ -449,7 +450,8 @@ class MultiTurnTester:
             "model_b_evaluation": finetuned_eval
         }
         
-        self.results.append(result)
+        if self.keep_results:
+            self.results.append(result)
         
         print(f"\n{'='*80}\n")
         return result